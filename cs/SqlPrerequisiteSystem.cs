@@ -3,6 +3,7 @@ using System.Collections.Generic;
 using System.Diagnostics;
 using System.IO;
 using System.Runtime.InteropServices;
+using System.Text.Json;
 using Avalonia.Platform;
 
 namespace AbiturEliteCode.cs;
@@ -52,6 +53,22 @@ internal static class SqlPrerequisiteSystem
     {
         try
         {
+            // prefer the index compiled by py/compile-prerequisites.py (urls already expanded)
+            var indexUri = new Uri("avares://AbiturEliteCode/assets/sql-prerequisites.json");
+            if (AssetLoader.Exists(indexUri))
+            {
+                using var indexStream = AssetLoader.Open(indexUri);
+                var sections = JsonSerializer.Deserialize<Dictionary<string, List<SqlLessonData>>>(indexStream);
+                if (sections != null)
+                {
+                    foreach (var lessons in sections.Values)
+                    foreach (var lesson in lessons)
+                        _database[lesson.Title] = lesson;
+                    return;
+                }
+            }
+
+            // fallback: parse the raw text file
             var uri = new Uri("avares://AbiturEliteCode/assets/sql-prerequisites.txt");
             if (AssetLoader.Exists(uri))
             {
@@ -1,7 +1,11 @@
 import subprocess
 import sys
 import os
+import re
+import time
 import shutil
+import hashlib
+import zipfile
 from pathlib import Path
 
 # ─── CONFIGURATION ────────────────────────────────────────────────────────────
@@ -11,6 +15,23 @@ PUBLISH_BASE  = r"F:\PERSONAL DATA\coding projects\AbiturEliteCode\AbiturEliteCo
 SEVEN_ZIP     = r"F:\APPLICATIONS\7-Zip\7z.exe"
 DESKTOP       = Path.home() / "Desktop"
 APP_NAME      = "AbiturEliteCode"
+RELEASES_DIR  = DESKTOP / f"{APP_NAME}-releases"   # <version>/<zip> of every build, base for deltas
+DELTA_SCRIPT  = Path(__file__).parent / "make-delta-update.py"
+PREREQ_SCRIPT = Path(__file__).parent / "compile-prerequisites.py"
+
+# Reproducible zips: sorted entries, fixed timestamps/permissions and a fixed
+# deflate level, so identical publish output gives bit-identical archives.
+# Set to False to fall back to 7-Zip.
+REPRODUCIBLE_ZIP = True
+ZIP_COMPRESS_LEVEL = 9
+# Entry timestamp: $SOURCE_DATE_EPOCH if set, otherwise the zip epoch (1980-01-01).
+# Zip cannot store earlier dates, so older epochs are clamped to it
+ZIP_EPOCH = 315532800
+ZIP_DATE_TIME = (
+    time.gmtime(max(int(os.environ["SOURCE_DATE_EPOCH"]), ZIP_EPOCH))[:6]
+    if os.environ.get("SOURCE_DATE_EPOCH") else (1980, 1, 1, 0, 0, 0)
+)
+CHECKSUMS_FILE = DESKTOP / f"{APP_NAME}-SHA256SUMS.txt"
 
 # (dotnet runtime id, display label, zip suffix)
 TARGETS = [
@@ -67,16 +88,75 @@ def run(cmd: list[str], cwd: str | None = None) -> subprocess.CompletedProcess:
         raise RuntimeError(f"Command failed: {' '.join(cmd)}")
     return result
 
-# ─── STEPS (5 per target) ─────────────────────────────────────────────────────
+def read_app_version() -> str:
+    """CurrentVersion from UpdateManager.cs, so releases are archived under the shipped version."""
+    update_manager = Path(PROJECT_DIR) / "cs" / "UpdateManager.cs"
+    match = re.search(r'CurrentVersion\s*=\s*"([^"]+)"', update_manager.read_text(encoding="utf-8"))
+    if not match:
+        raise RuntimeError(f"CurrentVersion not found in {update_manager}")
+    return match.group(1)
+
+def version_key(version: str) -> tuple[int, ...]:
+    return tuple(int(p) for p in re.findall(r'\d+', version))
+
+def previous_release(version: str, zip_name: str) -> tuple[str, Path] | None:
+    """Newest archived release older than `version` that has a zip for this platform."""
+    if not RELEASES_DIR.exists():
+        return None
+    older = [
+        d for d in RELEASES_DIR.iterdir()
+        if d.is_dir() and (d / zip_name).exists() and version_key(d.name) < version_key(version)
+    ]
+    if not older:
+        return None
+    latest = max(older, key=lambda d: version_key(d.name))
+    return latest.name, latest / zip_name
+
+def zip_entry(name: str, mode: int) -> zipfile.ZipInfo:
+    entry = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+    entry.create_system = 3                 # unix, so the permission bits are honoured everywhere
+    entry.external_attr = mode << 16
+    if name.endswith("/"):
+        entry.external_attr |= 0x10         # MS-DOS directory bit, as zipfile sets it
+    return entry
+
+def write_reproducible_zip(base_dir: Path, folder: str, zip_path: Path) -> None:
+    """Zip base_dir/folder (stored as folder/...) with sorted entries and normalised metadata."""
+    root = base_dir / folder
+    paths = sorted(root.rglob("*"), key=lambda p: p.relative_to(base_dir).as_posix())
+    tmp_path = zip_path.with_suffix(".zip.tmp")
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED, compresslevel=ZIP_COMPRESS_LEVEL) as zf:
+        zf.writestr(zip_entry(f"{folder}/", 0o40755), b"")
+        for path in paths:
+            name = path.relative_to(base_dir).as_posix()
+            if path.is_dir():
+                zf.writestr(zip_entry(f"{name}/", 0o40755), b"")
+            else:
+                # The publish output comes from Windows, so the executable bit is decided by name
+                executable = path.name == APP_NAME or path.suffix == ".sh"
+                entry = zip_entry(name, 0o100755 if executable else 0o100644)
+                entry.compress_type = zipfile.ZIP_DEFLATED
+                zf.writestr(entry, path.read_bytes(), compresslevel=ZIP_COMPRESS_LEVEL)
+    tmp_path.replace(zip_path)
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+# ─── STEPS (6 per target) ─────────────────────────────────────────────────────
 # 1. Prepare temp dir
 # 2. dotnet publish
 # 3. Copy files into AbiturEliteCode/ sub-folder
-# 4. Create zip with 7-Zip
-# 5. Move zip to Desktop
+# 4. Create zip (reproducible writer or 7-Zip)
+# 5. Archive release, write manifest + delta against the previous release
+# 6. Cleanup staging dir
 
-def build_target(runtime_id: str, label: str, zip_suffix: str) -> None:
+def build_target(runtime_id: str, label: str, zip_suffix: str, version: str) -> list[Path]:
     section(f"Building for {label}  ({runtime_id}-x64)")
-    STEPS = 5
+    STEPS = 6
 
     # ── Step 1: Prepare temp staging dir ──────────────────────────────────────
     progress_bar(1, STEPS, "Preparing staging directory …")
@@ -109,7 +189,7 @@ def build_target(runtime_id: str, label: str, zip_suffix: str) -> None:
     progress_bar(3, STEPS, "Copying published files …")
     if not publish_src.exists():
         raise FileNotFoundError(f"Publish output not found: {publish_src}")
-    files = list(publish_src.iterdir())
+    files = sorted(publish_src.iterdir())
     if not files:
         raise FileNotFoundError(f"No files found in publish directory: {publish_src}")
     for f in files:
@@ -120,22 +200,56 @@ def build_target(runtime_id: str, label: str, zip_suffix: str) -> None:
             shutil.copy2(f, dest)
     progress_bar(3, STEPS, f"Copied {len(files)} item(s)")
 
-    # ── Step 4: Compress with 7-Zip ────────────────────────────────────────────
+    # ── Step 4: Compress ───────────────────────────────────────────────────────
     progress_bar(4, STEPS, f"Creating {zip_name} …")
     # We zip the APP_NAME folder itself (so inside the zip: AbiturEliteCode/<files>)
-    # 7z a <zip_path> <folder_to_zip>  (run from staging so path is relative)
+    if REPRODUCIBLE_ZIP:
+        write_reproducible_zip(staging, APP_NAME, zip_dest)
+    else:
+        # 7z a <zip_path> <folder_to_zip>  (run from staging so path is relative)
+        # 7z adds to an existing archive, so remove the zip of the previous run first
+        zip_dest.unlink(missing_ok=True)
+        run(
+            [SEVEN_ZIP, "a", str(zip_dest), APP_NAME],
+            cwd=str(staging),
+        )
+    progress_bar(4, STEPS, "Zip created")
+
+    # ── Step 5: Archive release, manifest + delta ─────────────────────────────
+    progress_bar(5, STEPS, "Writing manifest …")
+    release_dir = RELEASES_DIR / version
+    release_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(zip_dest, release_dir / zip_name)
+    manifest_dest = DESKTOP / f"{APP_NAME}-{zip_suffix}.manifest.json"
     run(
-        [SEVEN_ZIP, "a", str(zip_dest), APP_NAME],
-        cwd=str(staging),
+        [sys.executable, str(DELTA_SCRIPT), "manifest", str(zip_dest), str(manifest_dest),
+         "--version", version],
     )
-    progress_bar(4, STEPS, "Zip created")
 
-    # ── Step 5: Cleanup staging dir ───────────────────────────────────────────
-    progress_bar(5, STEPS, "Cleaning up …")
+    delta_dest = None
+    previous = previous_release(version, zip_name)
+    if previous:
+        prev_version, prev_zip = previous
+        progress_bar(5, STEPS, f"Delta from {prev_version} …")
+        delta_dest = DESKTOP / f"{APP_NAME}-{zip_suffix}-from-{prev_version}.delta.zip"
+        run(
+            [sys.executable, str(DELTA_SCRIPT), "diff", str(prev_zip), str(zip_dest), str(delta_dest),
+             "--from", prev_version, "--to", version],
+        )
+    progress_bar(5, STEPS, "Release archived")
+
+    # ── Step 6: Cleanup staging dir ───────────────────────────────────────────
+    progress_bar(6, STEPS, "Cleaning up …")
     shutil.rmtree(staging)
-    progress_bar(5, STEPS, "Done")
+    progress_bar(6, STEPS, "Done")
 
     ok(f"Saved → {zip_dest}")
+    ok(f"Saved → {manifest_dest}")
+    if delta_dest:
+        ok(f"Saved → {delta_dest}")
+    else:
+        info(f"No earlier release in {RELEASES_DIR}, skipped delta")
+    return [p for p in (zip_dest, manifest_dest, delta_dest) if p]
 
 # ─── MAIN ─────────────────────────────────────────────────────────────────────
 
@@ -145,20 +259,35 @@ def main() -> None:
     print(f"{'═'*55}{RESET}")
     info(f"Project : {PROJECT_DIR}")
     info(f"Desktop : {DESKTOP}")
-    info(f"7-Zip   : {SEVEN_ZIP}")
+    info(f"7-Zip   : {SEVEN_ZIP if not REPRODUCIBLE_ZIP else 'not used (reproducible zip)'}")
+    info(f"Releases: {RELEASES_DIR}")
 
     # Sanity checks before we do anything
     if not Path(PROJECT_DIR).exists():
         err(f"Project directory not found:\n     {PROJECT_DIR}")
         sys.exit(1)
-    if not Path(SEVEN_ZIP).exists():
+    if not REPRODUCIBLE_ZIP and not Path(SEVEN_ZIP).exists():
         err(f"7-Zip not found at:\n     {SEVEN_ZIP}")
         sys.exit(1)
 
+    version = read_app_version()
+    info(f"Version : {version}")
+
+    # Compile the prerequisites index once, so no platform ships a stale or dangling one
+    section("Compiling prerequisites index")
+    try:
+        result = run([sys.executable, str(PREREQ_SCRIPT)])
+        for line in result.stdout.strip().splitlines()[1:]:
+            info(line.strip())
+    except RuntimeError:
+        err("Prerequisites check failed, aborting build")
+        sys.exit(1)
+
     failed = []
+    artifacts = []
     for runtime_id, label, zip_suffix in TARGETS:
         try:
-            build_target(runtime_id, label, zip_suffix)
+            artifacts += build_target(runtime_id, label, zip_suffix, version)
         except Exception as exc:
             print()
             err(f"{label} build FAILED: {exc}")
@@ -178,6 +307,14 @@ def main() -> None:
         else:
             err(f"{label:<10}  zip not found (unexpected)")
 
+    # sha256sum -c compatible checksum list for caches and mirrors
+    if artifacts:
+        CHECKSUMS_FILE.write_text(
+            "".join(f"{sha256_file(p)}  {p.name}\n" for p in sorted(artifacts)),
+            encoding="utf-8",
+        )
+        info(f"Checksums → {CHECKSUMS_FILE}")
+
     if failed:
         print(f"\n{RED}{BOLD}  {len(failed)} build(s) failed.{RESET}")
         sys.exit(1)
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Docs Bundle Builder for Abitur Elite Code
+Builds an optimized copy of the standalone docs/*.html pages in docs/dist/:
+  - CSS rules shared between pages move into one content-hashed stylesheet
+  - HTML, inline CSS and inline SVG are minified (pre/textarea/script untouched)
+  - identical inline scripts used by several pages become cacheable files
+  - docs/img/*.png get downscaled srcset variants           (needs Pillow)
+  - text files get precompressed .gz and .br siblings       (.br needs brotli)
+  - a per-page size report is printed and written to size-report.json
+
+The source pages in docs/ are never modified.
+"""
+
+import re
+import sys
+import gzip
+import json
+import shutil
+import hashlib
+from pathlib import Path
+from html.parser import HTMLParser
+from collections import Counter
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DOCS_DIR = Path(__file__).parent.parent / "docs"
+DIST_DIR = DOCS_DIR / "dist"
+ASSET_DIR = "assets"
+IMAGE_WIDTHS = (480, 800)          # srcset variants, only for images wider than these
+PRECOMPRESS_SUFFIXES = {".html", ".css", ".js", ".svg", ".json"}
+
+# Whitespace-only text between these tags never renders, so it can be dropped
+BLOCK_TAGS = {
+    "html", "head", "body", "title", "meta", "link", "style", "script", "div", "section",
+    "article", "header", "footer", "nav", "main", "aside", "p", "ul", "ol", "li", "dl",
+    "dt", "dd", "table", "thead", "tbody", "tfoot", "tr", "td", "th", "h1", "h2", "h3",
+    "h4", "h5", "h6", "hr", "br", "figure", "figcaption", "details", "summary", "form",
+    "svg", "g", "defs", "path", "rect", "circle", "ellipse", "line", "polyline",
+    "polygon", "marker", "use", "symbol",
+}
+RAW_TAGS = {"pre", "textarea", "script", "style"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+             "source", "track", "wbr"}
+
+# ─── CSS ──────────────────────────────────────────────────────────────────────
+
+def minify_css(css: str) -> str:
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    # No space removal before ":" (descendant pseudo-selectors) or around "+"/"-" (calc)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+def split_css(css: str) -> list[str]:
+    """Split minified CSS into top-level statements (rules, @media blocks, ...)."""
+    statements, depth, start, quote = [], 0, 0, None
+    for i, c in enumerate(css):
+        if quote:
+            if c == quote and css[i - 1] != "\\":
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                statements.append(css[start:i + 1])
+                start = i + 1
+        elif c == ";" and depth == 0:
+            statements.append(css[start:i + 1])
+            start = i + 1
+    if css[start:].strip():
+        statements.append(css[start:])
+    return statements
+
+def css_properties(statement: str) -> set[str]:
+    """Property names a statement sets; @keyframes count as a pseudo-property."""
+    keyframes = re.match(r'@(?:-\w+-)?keyframes\s*([\w-]+)', statement)
+    if keyframes:
+        return {f"@keyframes {keyframes.group(1)}"}
+    return set(re.findall(r'[{;]\s*(-?[\w-]+)\s*:', statement))
+
+def properties_overlap(a: set[str], b: set[str]) -> bool:
+    for x in a:
+        for y in b:
+            # Shorthands overlap with their longhands ("border" / "border-left-color")
+            if x == y or x.startswith(y + "-") or y.startswith(x + "-") or "all" in (x, y):
+                return True
+    return False
+
+def css_selectors(statement: str) -> list[str]:
+    return [sel for block in re.findall(r'([^{}]+)\{[^{}]*\}', statement)
+            if not block.strip().startswith("@") for sel in block.split(",")]
+
+def markup_elements(markup: str) -> list[tuple[str, set[str], str]]:
+    """(tag, classes, id) of every element in the page source."""
+    elements = []
+    for tag, attrs in re.findall(r'<([a-zA-Z][\w-]*)([^>]*)>', markup):
+        classes = re.search(r'\sclass="([^"]*)"', attrs)
+        element_id = re.search(r'\sid="([^"]*)"', attrs)
+        elements.append((tag.lower(), set(classes.group(1).split()) if classes else set(),
+                         element_id.group(1) if element_id else ""))
+    return elements
+
+def subject_matches(selector: str, elements: list) -> set[int] | None:
+    """Indices of elements the selector's rightmost compound can match, ignoring
+    pseudo-classes and attributes. None if it matches nothing in the markup
+    (e.g. elements built by scripts), which callers must treat as unknown."""
+    compound = re.split(r'[\s>+~]+', selector.strip())[-1]
+    compound = re.sub(r'::?[\w-]+(\([^)]*\))?|\[[^\]]*\]', '', compound)
+    tag = re.match(r'[a-zA-Z][\w-]*', compound)
+    classes = set(re.findall(r'\.([\w-]+)', compound))
+    ids = re.findall(r'#([\w-]+)', compound)
+    matched = {
+        i for i, (el_tag, el_classes, el_id) in enumerate(elements)
+        if (not tag or tag.group(0).lower() == el_tag) and classes <= el_classes
+        and all(el_id == x for x in ids)
+    }
+    return matched or None
+
+def statement_targets(statement: str, elements: list) -> set[int] | None:
+    targets = set()
+    selectors = css_selectors(statement)
+    if not selectors or statement.startswith("@") and not statement.startswith("@media"):
+        return None
+    for selector in selectors:
+        matched = subject_matches(selector, elements)
+        if matched is None:
+            return None
+        targets |= matched
+    return targets
+
+def inert_in(statement: str, markup: str) -> bool:
+    """True if the statement cannot affect a page: every selector needs a class
+    or id that never occurs in that page's markup or scripts."""
+    keyframes = re.match(r'@(?:-\w+-)?keyframes\s*([\w-]+)', statement)
+    if keyframes:
+        return keyframes.group(1) not in markup
+    if statement.startswith("@") and not statement.startswith("@media"):
+        return False
+    selectors = css_selectors(statement)
+    if not selectors:
+        return False
+    for selector in selectors:
+        names = re.findall(r'[.#]([\w-]+)', selector)
+        if not names or all(name in markup for name in names):
+            return False
+    return True
+
+def plan_shared_css(pages: dict) -> tuple[list[str], dict[str, set[int]]]:
+    """Choose the shared stylesheet and, per page, which of its rules can be served from it.
+
+    The stylesheet is linked before a page's remaining inline <style>, so a rule may
+    only move there if every earlier rule it could conflict with (overlapping
+    properties on a possibly common element) moves too and comes first in the
+    shared file. Rules a page does not contain are only shared if they are inert
+    for that page."""
+    counts = Counter(s for page in pages.values() for s in set(page["css"]))
+    candidates = []
+    for page in pages.values():
+        for statement in page["css"]:
+            if counts[statement] >= 2 and statement not in candidates and not statement.startswith("@import") \
+                    and all(statement in p["css"] or inert_in(statement, p["markup"]) for p in pages.values()):
+                candidates.append(statement)
+
+    while True:
+        order = {s: i for i, s in enumerate(candidates)}
+        moves = {}
+        for name, page in pages.items():
+            moved = set()
+            props = [css_properties(s) for s in page["css"]]
+            targets = [statement_targets(s, page["elements"]) for s in page["css"]]
+
+            def conflicts(j, i):
+                if not properties_overlap(props[j], props[i]):
+                    return False
+                return targets[j] is None or targets[i] is None or bool(targets[j] & targets[i])
+
+            for i, statement in enumerate(page["css"]):
+                if statement not in order:
+                    continue
+                if all(j in moved and order[page["css"][j]] < order[statement]
+                       for j in range(i) if conflicts(j, i)):
+                    moved.add(i)
+            moves[name] = moved
+        used = Counter(pages[n]["css"][i] for n, moved in moves.items() for i in moved)
+        # Rules only one page serves from the bundle are cheaper inline
+        kept = [s for s in candidates if used[s] >= 2]
+        if kept == candidates:
+            return candidates, moves
+        candidates = kept
+
+# ─── HTML ─────────────────────────────────────────────────────────────────────
+
+class HtmlMinifier(HTMLParser):
+    """Re-emits the source tag by tag: comments are dropped, whitespace is collapsed
+    outside raw elements and elements whose class keeps whitespace (white-space:pre)."""
+
+    def __init__(self, preserve_classes: set[str]):
+        super().__init__(convert_charrefs=False)
+        self.preserve_classes = preserve_classes
+        self.out = []
+        self.raw_tag = None
+        self.raw_depth = 0
+        self.pending_space = None
+        self.last_tag = None
+
+    def _flush_space(self, next_tag: str | None) -> None:
+        if self.pending_space is not None:
+            if not (self.last_tag in BLOCK_TAGS or next_tag in BLOCK_TAGS):
+                self.out.append(" ")
+            self.pending_space = None
+
+    def handle_decl(self, decl):
+        self.out.append(f"<!{decl}>")
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_space(tag)
+        self.out.append(self.get_starttag_text())
+        self.last_tag = tag
+        if self.raw_tag:
+            if tag == self.raw_tag:
+                self.raw_depth += 1
+            return
+        classes = set((dict(attrs).get("class") or "").split())
+        if tag in RAW_TAGS or (tag not in VOID_TAGS and classes & self.preserve_classes):
+            self.raw_tag, self.raw_depth = tag, 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush_space(tag)
+        self.out.append(self.get_starttag_text())
+        self.last_tag = tag
+
+    def handle_endtag(self, tag):
+        if self.raw_tag:
+            if tag == self.raw_tag:
+                self.raw_depth -= 1
+                if self.raw_depth == 0:
+                    self.raw_tag = None
+        else:
+            self._flush_space(tag)
+        self.out.append(f"</{tag}>")
+        self.last_tag = tag
+
+    def handle_data(self, data):
+        if self.raw_tag:
+            self.out.append(data)
+            return
+        collapsed = re.sub(r'\s+', ' ', data)
+        if not collapsed.strip():
+            self.pending_space = " "
+            return
+        self._flush_space(None)
+        self.last_tag = None
+        self.out.append(collapsed)
+
+    def handle_entityref(self, name):
+        self._flush_space(None)
+        self.last_tag = None
+        self.out.append(f"&{name};")
+
+    def handle_charref(self, name):
+        self._flush_space(None)
+        self.last_tag = None
+        self.out.append(f"&#{name};")
+
+    def handle_comment(self, data):
+        if self.raw_tag:
+            self.out.append(f"<!--{data}-->")
+
+def minify_html(html: str, preserve_classes: set[str]) -> str:
+    parser = HtmlMinifier(preserve_classes)
+    parser.feed(html)
+    parser.close()
+    return "".join(parser.out).strip()
+
+def preserved_classes(css: str) -> set[str]:
+    """Classes styled with white-space:pre*, whose text must keep its whitespace."""
+    classes = set()
+    for selectors, body in re.findall(r'([^{}]+)\{([^{}]*)\}', css):
+        if re.search(r'white-space:pre', body):
+            for selector in selectors.split(","):
+                classes.update(re.findall(r'\.([\w-]+)', selector))
+    return classes
+
+# ─── IMAGES ───────────────────────────────────────────────────────────────────
+
+def swapped_images(html: str) -> set[str]:
+    """Image urls a page script swaps in through data-*-src attributes."""
+    return set(re.findall(r'\sdata-[\w-]+-src="([^"]+)"', html))
+
+def build_image_variants(src: Path, dest_dir: Path, widths: tuple = IMAGE_WIDTHS) -> dict:
+    """Copy an image and write smaller PNG variants. Returns width/height and
+    the srcset candidates (url suffix -> width), largest last."""
+    shutil.copy2(src, dest_dir / src.name)
+    if Image is None:
+        return {}
+    with Image.open(src) as img:
+        width, height = img.size
+        variants = []
+        for target in widths:
+            if target >= width:
+                continue
+            name = f"{src.stem}-{target}w{src.suffix}"
+            resized = img.convert("RGBA").resize((target, round(height * target / width)), Image.LANCZOS)
+            # Back to a palette so the variant stays as small as the source PNGs
+            resized.quantize(256, method=Image.Quantize.FASTOCTREE).save(dest_dir / name, optimize=True)
+            if (dest_dir / name).stat().st_size < src.stat().st_size:
+                variants.append((name, target))
+            else:
+                (dest_dir / name).unlink()
+    return {"width": width, "height": height, "variants": variants + [(src.name, width)]}
+
+def rewrite_images(html: str, images: dict) -> str:
+    """Add intrinsic size, lazy loading and a srcset to every <img> with known variants.
+    Images a page script swaps through data-*-src attributes only get lazy loading:
+    the browser ignores src changes once a srcset is set, and the swapped file may
+    have a different size."""
+    swapped = swapped_images(html)
+
+    def replace(match):
+        tag = match.group(0)
+        src = re.search(r'\ssrc="([^"]+)"', tag)
+        info = images.get(src.group(1)) if src else None
+        if not info or "srcset" in tag:
+            return tag
+        end = re.search(r'\s*/?>$', tag).start()
+        if src.group(1) in swapped or re.search(r'\sdata-[\w-]+-src=', tag):
+            return tag[:end] + ' loading="lazy" decoding="async"' + tag[end:]
+        folder = src.group(1).rsplit("/", 1)[0] + "/" if "/" in src.group(1) else ""
+        # width/height keep the rendered size at the original's; the CSS caps it at max-width:100%
+        extra = f' width="{info["width"]}" height="{info["height"]}" loading="lazy" decoding="async"'
+        if len(info["variants"]) > 1:
+            srcset = ", ".join(f"{folder}{name} {w}w" for name, w in info["variants"])
+            extra += f' srcset="{srcset}" sizes="(max-width: {info["width"]}px) 100vw, {info["width"]}px"'
+        return tag[:end] + extra + tag[end:]
+    return re.sub(r'<img\b[^>]*>', replace, html)
+
+# ─── OUTPUT ───────────────────────────────────────────────────────────────────
+
+def hashed_name(prefix: str, data: bytes, suffix: str) -> str:
+    return f"{prefix}.{hashlib.sha256(data).hexdigest()[:10]}{suffix}"
+
+def precompress(path: Path) -> dict[str, int]:
+    data = path.read_bytes()
+    sizes = {"raw": len(data)}
+    with open(path.with_name(path.name + ".gz"), "wb") as f:
+        # mtime=0 keeps the .gz files reproducible
+        with gzip.GzipFile(filename="", mode="wb", fileobj=f, compresslevel=9, mtime=0) as gz:
+            gz.write(data)
+    sizes["gz"] = path.with_name(path.name + ".gz").stat().st_size
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(data, quality=11))
+        sizes["br"] = path.with_name(path.name + ".br").stat().st_size
+    return sizes
+
+def main() -> None:
+    print("Docs Bundle Builder - Abitur Elite Code")
+    sources = sorted(DOCS_DIR.glob("*.html"))
+    if not sources:
+        print(f"No pages found in {DOCS_DIR}")
+        sys.exit(1)
+    if Image is None:
+        print("Warning: Pillow not installed, skipping responsive image variants.")
+    if brotli is None:
+        print("Warning: brotli not installed, skipping .br files.")
+
+    if DIST_DIR.exists():
+        shutil.rmtree(DIST_DIR)
+    (DIST_DIR / ASSET_DIR).mkdir(parents=True)
+
+    pages = {}
+    for path in sources:
+        html = path.read_text(encoding="utf-8")
+        css = minify_css("".join(re.findall(r'<style[^>]*>(.*?)</style>', html, re.DOTALL)))
+        pages[path.name] = {
+            "html": html,
+            "css": split_css(css),
+            "markup": re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL),
+            "elements": markup_elements(html),
+            "preserve": preserved_classes(css),
+        }
+
+    # Shared CSS
+    shared_css, moves = plan_shared_css(pages)
+    css_link = ""
+    if shared_css:
+        data = "".join(shared_css).encode("utf-8")
+        css_name = hashed_name("shared", data, ".css")
+        (DIST_DIR / ASSET_DIR / css_name).write_bytes(data)
+        css_link = f'<link rel="stylesheet" href="{ASSET_DIR}/{css_name}">'
+
+    # Inline scripts used by more than one page
+    script_counts = Counter(s for page in pages.values()
+                            for s in set(re.findall(r'<script>(.*?)</script>', page["html"], re.DOTALL)))
+    shared_scripts = {}
+    for script, count in script_counts.items():
+        if count >= 2 and script.strip():
+            data = script.strip().encode("utf-8")
+            name = hashed_name("script", data, ".js")
+            (DIST_DIR / ASSET_DIR / name).write_bytes(data)
+            shared_scripts[script] = f"{ASSET_DIR}/{name}"
+
+    # Images; the ones toggle scripts swap never get a srcset, so no variants either
+    images = {}
+    swapped = set().union(*(swapped_images(page["html"]) for page in pages.values()))
+    img_src = DOCS_DIR / "img"
+    if img_src.exists():
+        (DIST_DIR / "img").mkdir()
+        for img in sorted(img_src.iterdir()):
+            if img.is_file():
+                widths = () if f"img/{img.name}" in swapped else IMAGE_WIDTHS
+                info = build_image_variants(img, DIST_DIR / "img", widths)
+                if info:
+                    images[f"img/{img.name}"] = info
+
+    # Pages
+    referenced = set()
+    for name, page in pages.items():
+        moved = moves.get(name, set())
+        inline_css = "".join(s for i, s in enumerate(page["css"]) if i not in moved)
+        html = page["html"]
+        first_style = True
+
+        def replace_style(_match):
+            nonlocal first_style
+            if not first_style:
+                return ""
+            first_style = False
+            link = css_link if moved else ""
+            return link + (f"<style>{inline_css}</style>" if inline_css else "")
+
+        html = re.sub(r'<style[^>]*>.*?</style>', replace_style, html, flags=re.DOTALL)
+        for script, src in shared_scripts.items():
+            html = html.replace(f"<script>{script}</script>", f'<script src="{src}"></script>')
+        html = rewrite_images(html, images)
+        for srcset in re.findall(r'\ssrcset="([^"]+)"', html):
+            referenced.update(c.split()[0] for c in srcset.split(","))
+        html = minify_html(html, page["preserve"])
+        (DIST_DIR / name).write_text(html, encoding="utf-8")
+
+    # Drop variants no page ended up referencing
+    for src, info in images.items():
+        folder = src.rsplit("/", 1)[0] + "/"
+        *variants, original = info["variants"]
+        for name, _ in variants:
+            if folder + name not in referenced:
+                (DIST_DIR / folder / name).unlink()
+        info["variants"] = [v for v in variants if folder + v[0] in referenced] + [original]
+
+    # Precompress + report
+    report = {"pages": {}, "assets": {}}
+    for path in sorted(DIST_DIR.rglob("*")):
+        if path.is_file() and path.suffix in PRECOMPRESS_SUFFIXES:
+            sizes = precompress(path)
+            rel = path.relative_to(DIST_DIR).as_posix()
+            if path.parent == DIST_DIR:
+                sizes["source"] = (DOCS_DIR / path.name).stat().st_size
+                report["pages"][rel] = sizes
+            else:
+                report["assets"][rel] = sizes
+    report["images"] = {
+        src: {"width": info["width"], "variants": [n for n, _ in info["variants"][:-1]]}
+        for src, info in images.items()
+    }
+    (DIST_DIR / "size-report.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    def kb(n):
+        return f"{n / 1024:7.1f}" if n is not None else "      -"
+
+    print(f"\n  {'Page':<42}{'source':>8}{'min':>8}{'gz':>8}{'br':>8}   KB")
+    for rel, s in report["pages"].items():
+        print(f"  {rel:<42}{kb(s['source'])}{kb(s['raw'])}{kb(s['gz'])}{kb(s.get('br'))}")
+    for rel, s in report["assets"].items():
+        print(f"  {rel:<42}{'':>8}{kb(s['raw'])}{kb(s['gz'])}{kb(s.get('br'))}")
+    total_src = sum(s["source"] for s in report["pages"].values())
+    total_min = sum(s["raw"] for s in list(report["pages"].values()) + list(report["assets"].values()))
+    total_gz = sum(s["gz"] for s in list(report["pages"].values()) + list(report["assets"].values()))
+    print(f"\n  Total: {total_src / 1024:.1f} KB source -> {total_min / 1024:.1f} KB minified, "
+          f"{total_gz / 1024:.1f} KB gzip. {len(shared_css)} shared CSS rules, "
+          f"{sum(len(i['variants']) - 1 for i in images.values())} image variants -> {DIST_DIR}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Prerequisites Compiler for Abitur Elite Code
+Compiles assets/prerequisites.txt and assets/sql-prerequisites.txt into
+pre-normalized JSON indexes (expanded URLs, grouped by "> Section") that
+PrerequisiteSystem / SqlPrerequisiteSystem load directly, and checks that every
+title used by a level or listed in AllTopics has an entry.
+
+Exits with code 1 on dangling titles, duplicates, malformed lines or links
+outside the hosts the app is allowed to open.
+"""
+
+import re
+import sys
+import json
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Columns map to the LessonData properties; allowed mirrors the OpenUrl whitelist in each system
+CATALOGS = [
+    {
+        "name": "C#",
+        "source": ROOT / "assets" / "prerequisites.txt",
+        "output": ROOT / "assets" / "prerequisites.json",
+        "system": ROOT / "cs" / "PrerequisiteSystem.cs",
+        "levels": ROOT / "cs" / "Level.cs",
+        "columns": [("DometrainUrl", "dometrain:"), ("DocsUrl", "docs:")],
+        "allowed": ["https://dometrain.com/", "https://learn.microsoft.com/"],
+    },
+    {
+        "name": "SQL",
+        "source": ROOT / "assets" / "sql-prerequisites.txt",
+        "output": ROOT / "assets" / "sql-prerequisites.json",
+        "system": ROOT / "cs" / "SqlPrerequisiteSystem.cs",
+        "levels": ROOT / "cs" / "SqlLevel.cs",
+        "columns": [("YoutubeUrl", "youtube:"), ("DocsUrl", "docs:")],
+        "allowed": ["https://youtube.com/", "https://youtu.be/", "https://www.youtube.com/",
+                    "https://dev.mysql.com/"],
+    },
+]
+
+def normalize_url(raw: str, prefix: str) -> str:
+    url = raw.replace(prefix, "").strip()
+    # Dometrain links are stored relative to the site root
+    if prefix == "dometrain:" and url and not url.startswith("https://"):
+        url = "https://dometrain.com" + url
+    return url
+
+def compile_catalog(catalog: dict, errors: list[str]) -> dict[str, list[dict]]:
+    """Parse a prerequisites text file into {section: [lesson, ...]}."""
+    sections: dict[str, list[dict]] = {}
+    current = None
+    seen = set()
+    with open(catalog["source"], "r", encoding="utf-8-sig") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            where = f"{catalog['source'].name}:{line_no}"
+            if not line.strip():
+                continue
+            if line.startswith(">"):
+                current = line[1:].strip()
+                sections.setdefault(current, [])
+                continue
+
+            parts = line.split("|")
+            if len(parts) < 3:
+                errors.append(f"{where}: expected 'Title|...|...', got '{line}'")
+                continue
+            if current is None:
+                errors.append(f"{where}: entry before the first '> Section' line")
+                continue
+
+            title = parts[0].strip()
+            if title in seen:
+                errors.append(f"{where}: duplicate title '{title}'")
+            seen.add(title)
+
+            lesson = {"Title": title}
+            for (field, prefix), raw in zip(catalog["columns"], parts[1:]):
+                url = normalize_url(raw, prefix)
+                if url and not any(url.startswith(a) for a in catalog["allowed"]):
+                    errors.append(f"{where}: '{title}' links to a host the app will not open: {url}")
+                lesson[field] = url
+            sections[current].append(lesson)
+    return sections
+
+def string_lists(content: str, pattern: str) -> list[str]:
+    """All string literals inside the `{ ... }` bodies matched by `pattern`."""
+    titles = []
+    for body in re.findall(pattern, content, re.DOTALL):
+        titles += re.findall(r'"((?:[^"\\]|\\.)*)"', body)
+    return titles
+
+def check_coverage(catalog: dict, known: set[str], errors: list[str]) -> int:
+    """Every title referenced by a level or AllTopics must exist. Returns the number checked."""
+    levels_src = catalog["levels"].read_text(encoding="utf-8-sig")
+    system_src = catalog["system"].read_text(encoding="utf-8-sig")
+
+    referenced = {}
+    for title in string_lists(levels_src, r'Prerequisites\s*=\s*new\s*List<string>\s*\{(.*?)\}'):
+        referenced.setdefault(title, f"{catalog['levels'].name} (Prerequisites)")
+    for title in string_lists(system_src, r'AllTopics\s*=\s*new\s*\(\)\s*\{(.*?)\};'):
+        referenced.setdefault(title, f"{catalog['system'].name} (AllTopics)")
+
+    for title, source in sorted(referenced.items()):
+        if title not in known:
+            errors.append(f"{source}: no prerequisites entry for '{title}'")
+    return len(referenced)
+
+def main() -> None:
+    errors: list[str] = []
+    compiled = []
+    print("Prerequisites Compiler - Abitur Elite Code")
+
+    for catalog in CATALOGS:
+        if not catalog["source"].exists():
+            errors.append(f"Missing {catalog['source']}")
+            continue
+        sections = compile_catalog(catalog, errors)
+        known = {lesson["Title"] for lessons in sections.values() for lesson in lessons}
+        checked = check_coverage(catalog, known, errors)
+        compiled.append((catalog["output"], sections))
+        print(f"  {catalog['name']:<4} {len(known)} lessons in {len(sections)} sections, "
+              f"{checked} referenced titles checked -> {catalog['output'].name}")
+
+    # Only write when everything resolves, so the app never loads a broken index
+    if not errors:
+        for output, sections in compiled:
+            with open(output, "w", encoding="utf-8", newline="\n") as f:
+                json.dump(sections, f, ensure_ascii=False, separators=(",", ":"))
+                f.write("\n")
+
+    if errors:
+        print(f"\n{len(errors)} problem(s) found:", file=sys.stderr)
+        for e in errors:
+            print(f"  - {e}", file=sys.stderr)
+        sys.exit(1)
+    print("All prerequisites resolved.")
+
+if __name__ == "__main__":
+    main()
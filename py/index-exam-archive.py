@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Exam Archive Indexer for Abitur Elite Code
+Streams docs/archive/*.txt section by section into a persistent inverted index
+and answers frequency / co-occurrence queries against it.
+
+Usage:
+    python index-exam-archive.py                      (build / update the index)
+    python index-exam-archive.py freq ArrayList JOIN  (per-exam frequency)
+    python index-exam-archive.py cooc having "group by"
+    python index-exam-archive.py constructs --scope sql-queries
+    python index-exam-archive.py keywords java
+"""
+
+import re
+import sys
+import math
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from collections import Counter, defaultdict
+
+ARCHIVE_DIR = Path(__file__).parent.parent / "docs" / "archive"
+INDEX_FILE = Path(__file__).parent / "archive_index.json"
+INDEX_VERSION = 2
+
+# "--- [ABI 2025 B] ---" in most files, "[ABI 2025 B] Typ A" etc. in the diagram files
+SECTION_HEADER = re.compile(r'^(?:---\s*)?\[ABI (\d{4}) ([A-Z])\]')
+TOKEN_RE = re.compile(r'[A-Za-zÄÖÜäöüß_][\wÄÖÜäöüß]*')
+
+# Keywords and constructs are only counted in files of their own language,
+# otherwise German/English prose and the other language's code dominate the counts
+FILE_LANGUAGES = {
+    "java": ("pi-abi-oop-coding", "pi-abi-oop-data"),
+    "sql":  ("pi-abi-sql-",),
+}
+
+JAVA_KEYWORDS = {
+    "abstract", "boolean", "break", "case", "catch", "char", "class", "continue",
+    "default", "do", "double", "else", "extends", "final", "float", "for", "if",
+    "implements", "import", "instanceof", "int", "interface", "long", "new",
+    "null", "private", "protected", "public", "return", "static", "super",
+    "switch", "this", "throw", "throws", "try", "void", "while",
+}
+
+# The archive writes SQL in upper case, so matching case-sensitively skips prose ("in", "as", "set")
+SQL_KEYWORDS = {
+    "SELECT", "FROM", "WHERE", "JOIN", "INNER", "LEFT", "RIGHT", "ON", "GROUP",
+    "BY", "HAVING", "ORDER", "ASC", "DESC", "DISTINCT", "AS", "AND", "OR", "NOT",
+    "IN", "EXISTS", "LIKE", "BETWEEN", "IS", "NULL", "COUNT", "SUM", "AVG",
+    "MIN", "MAX", "INSERT", "INTO", "VALUES", "UPDATE", "SET", "DELETE",
+    "CREATE", "TABLE", "PRIMARY", "FOREIGN", "KEY", "REFERENCES", "UNION", "LIMIT",
+}
+KEYWORDS = {"java": JAVA_KEYWORDS, "sql": SQL_KEYWORDS}
+
+# Constructs are matched case-sensitively on the raw section text, so multi-word SQL clauses work
+CONSTRUCTS = {
+    "java": {
+        "for-Schleife":     r'\bfor\s*\(',
+        "while-Schleife":   r'\bwhile\s*\(',
+        "do-while":         r'\bdo\s*\{',
+        "switch":           r'\bswitch\s*\(',
+        "try/catch":        r'\btry\s*\{',
+        "Array":            r'\bnew\s+\w+\s*\[|\w\s*\[\s*\]\s+\w',
+        "List<T>":          r'\b(?:Array)?List\s*<',
+        "String-Methoden":  r'\.(?:substring|split|charAt|indexOf|equals|length)\s*\(',
+        "Vererbung":        r'\bextends\b',
+        "Interface":        r'\bimplements\b',
+        "Socket":           r'\b(?:Server)?Socket\b',
+        "Serial":           r'\bSerial\b',
+        "LocalDate":        r'\bLocalDate\b',
+        "Random":           r'\bRandom\b',
+    },
+    "sql": {
+        "JOIN":             r'\bJOIN\b',
+        "LEFT/RIGHT JOIN":  r'\b(?:LEFT|RIGHT)\s+(?:OUTER\s+)?JOIN\b',
+        "GROUP BY":         r'\bGROUP\s+BY\b',
+        "HAVING":           r'\bHAVING\b',
+        "ORDER BY":         r'\bORDER\s+BY\b',
+        "Unterabfrage":     r'\(\s*SELECT\b',
+        "Aggregat":         r'\b(?:COUNT|SUM|AVG|MIN|MAX)\s*\(',
+        "DISTINCT":         r'\bDISTINCT\b',
+        "LIKE":             r'\bLIKE\b',
+        "EXISTS":           r'\bEXISTS\b',
+        "BETWEEN":          r'\bBETWEEN\b',
+        "INSERT":           r'\bINSERT\s+INTO\b',
+        "UPDATE":           r'\bUPDATE\s+\w+\s+SET\b',
+        "DELETE":           r'\bDELETE\s+FROM\b',
+        "CREATE TABLE":     r'\bCREATE\s+TABLE\b',
+    },
+}
+CONSTRUCT_PATTERNS = {
+    lang: {name: re.compile(pattern) for name, pattern in patterns.items()}
+    for lang, patterns in CONSTRUCTS.items()
+}
+
+def file_language(name: str) -> str | None:
+    """"java", "sql" or None (diagram/prose files) for an archive file name."""
+    for lang, prefixes in FILE_LANGUAGES.items():
+        if name.startswith(prefixes):
+            return lang
+    return None
+
+# ─── STREAMING PIPELINE ───────────────────────────────────────────────────────
+
+def iter_lines(path: Path, start: int = 0):
+    """Yield (byte_offset, line) pairs without loading the whole file."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        for raw in f:
+            yield offset, raw.decode("utf-8", errors="replace")
+            offset += len(raw)
+
+def iter_sections(lines):
+    """Group a line stream into (exam, byte_offset, text) sections.
+    Text before the first header (notes) is skipped."""
+    exam, start, buf = None, 0, []
+    for offset, line in lines:
+        match = SECTION_HEADER.match(line.strip())
+        if match:
+            if exam:
+                yield exam, start, "".join(buf)
+            exam, start, buf = f"{match.group(1)} {match.group(2)}", offset, []
+        elif exam:
+            buf.append(line)
+    if exam:
+        yield exam, start, "".join(buf)
+
+def analyze(sections, lang: str | None):
+    """Attach token counts, keyword counts and detected constructs to each section.
+    Keywords and constructs are only looked for in `lang`, the file's language."""
+    keywords = KEYWORDS.get(lang, set())
+    patterns = CONSTRUCT_PATTERNS.get(lang, {})
+    for exam, offset, text in sections:
+        raw = TOKEN_RE.findall(text)
+        tokens = Counter(t.lower() for t in raw)
+        found = Counter(t for t in raw if t in keywords)
+        constructs = sorted(n for n, p in patterns.items() if p.search(text))
+        yield exam, offset, tokens, dict(found), constructs
+
+# ─── INDEX ────────────────────────────────────────────────────────────────────
+
+def empty_index() -> dict:
+    return {"version": INDEX_VERSION, "files": {}, "sections": {}, "postings": {}}
+
+def load_index() -> dict:
+    if INDEX_FILE.exists():
+        try:
+            with open(INDEX_FILE, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION:
+                return index
+        except json.JSONDecodeError:
+            print("Warning: Corrupt index file found. Rebuilding.")
+    return empty_index()
+
+def save_index(index: dict) -> None:
+    with open(INDEX_FILE, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+
+def prefix_hash(path: Path, length: int) -> str:
+    """SHA-1 over the first `length` bytes, read in chunks."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(65536, remaining))
+            if not chunk:
+                break
+            h.update(chunk)
+            remaining -= len(chunk)
+    return h.hexdigest()
+
+def drop_sections(index: dict, section_ids: set[str]) -> None:
+    if not section_ids:
+        return
+    for token in list(index["postings"]):
+        posting = index["postings"][token]
+        for sid in section_ids & posting.keys():
+            del posting[sid]
+        if not posting:
+            del index["postings"][token]
+    for sid in section_ids:
+        index["sections"].pop(sid, None)
+
+def index_file(index: dict, path: Path, start: int = 0) -> int:
+    """Index all sections of `path` starting at byte `start`.
+    Returns the offset of the last section, where an append can resume."""
+    name = path.name
+    lang = file_language(name)
+    last_start = start
+    for exam, offset, tokens, keywords, constructs in analyze(iter_sections(iter_lines(path, start)), lang):
+        # An exam can appear more than once per file, the offset keeps ids unique
+        sid = f"{name}@{offset}"
+        index["sections"][sid] = {
+            "file": name,
+            "exam": exam,
+            "offset": offset,
+            "lang": lang,
+            "tokens": sum(tokens.values()),
+            "keywords": keywords,
+            "constructs": constructs,
+        }
+        for token, count in tokens.items():
+            index["postings"].setdefault(token, {})[sid] = count
+        last_start = offset
+    return last_start
+
+def update_index(index: dict) -> tuple[int, int, int, int]:
+    """Bring the index up to date with the archive directory.
+    Unchanged files are skipped, appended-to files are resumed at their last
+    section, everything else is re-indexed.
+    Returns (skipped, resumed, rebuilt, removed)."""
+    skipped = resumed = rebuilt = removed = 0
+    present = {p.name: p for p in sorted(ARCHIVE_DIR.glob("*.txt"))}
+
+    for name in set(index["files"]) - present.keys():
+        drop_sections(index, {s for s, v in index["sections"].items() if v["file"] == name})
+        del index["files"][name]
+        removed += 1
+
+    for name, path in present.items():
+        size = path.stat().st_size
+        entry = index["files"].get(name)
+        file_sids = {s for s, v in index["sections"].items() if v["file"] == name}
+
+        if entry and entry["size"] == size and prefix_hash(path, size) == entry["sha1"]:
+            skipped += 1
+            continue
+
+        # Appended: everything before the last section is byte-identical,
+        # so only the last section (which may have grown) and new ones are re-read
+        tail = entry["tail"] if entry else 0
+        if entry and tail and size > entry["size"] and prefix_hash(path, tail) == entry["tail_sha1"]:
+            drop_sections(index, {s for s in file_sids if index["sections"][s]["offset"] >= tail})
+            tail = index_file(index, path, tail)
+            resumed += 1
+        else:
+            drop_sections(index, file_sids)
+            tail = index_file(index, path)
+            rebuilt += 1
+
+        index["files"][name] = {
+            "size": size,
+            "sha1": prefix_hash(path, size),
+            "tail": tail,
+            "tail_sha1": prefix_hash(path, tail),
+        }
+
+    return skipped, resumed, rebuilt, removed
+
+# ─── QUERIES ──────────────────────────────────────────────────────────────────
+
+def normalize_term(term: str) -> list[str]:
+    return [t.lower() for t in TOKEN_RE.findall(term)]
+
+def matching_sections(index: dict, term: str, scope: str | None) -> dict[str, int]:
+    """Sections containing every token of `term` (phrases are AND-ed),
+    mapped to the smallest token count among them."""
+    result = None
+    for token in normalize_term(term):
+        posting = index["postings"].get(token, {})
+        if result is None:
+            result = dict(posting)
+        else:
+            result = {s: min(c, posting[s]) for s, c in result.items() if s in posting}
+    result = result or {}
+    if scope:
+        result = {s: c for s, c in result.items() if scope in index["sections"][s]["file"]}
+    return result
+
+def exams_of(index: dict, sids) -> list[str]:
+    return sorted({index["sections"][s]["exam"] for s in sids})
+
+def query_freq(index: dict, terms: list[str], scope: str | None) -> None:
+    total_exams = len(exams_of(index, [s for s in index["sections"]
+                                       if not scope or scope in index["sections"][s]["file"]]))
+    for term in terms:
+        hits = matching_sections(index, term, scope)
+        exams = exams_of(index, hits)
+        print(f"\n{term}: {sum(hits.values())}× in {len(exams)}/{total_exams} Prüfungen")
+        per_exam = defaultdict(int)
+        for sid, count in hits.items():
+            per_exam[index["sections"][sid]["exam"]] += count
+        for exam in exams:
+            print(f"  ABI {exam:<7} {per_exam[exam]:>4}")
+
+def query_cooc(index: dict, terms: list[str], scope: str | None, top: int) -> None:
+    hit_sets = [set(matching_sections(index, t, scope)) for t in terms]
+    both = set.intersection(*hit_sets)
+    print(f"\n{' + '.join(terms)}: gemeinsam in {len(exams_of(index, both))} Prüfungen")
+    for exam in exams_of(index, both):
+        print(f"  ABI {exam}")
+
+    if len(terms) == 1:
+        # Tokens sharing the most sections with the term, weighted by how rare
+        # they are overall so that filler words ("und", "die", ...) drop out
+        anchor = set(normalize_term(terms[0]))
+        in_scope = [s for s, v in index["sections"].items() if not scope or scope in v["file"]]
+        scores = {}
+        for token, posting in index["postings"].items():
+            shared = len(both & posting.keys())
+            if token in anchor or not shared:
+                continue
+            df = sum(1 for s in in_scope if s in posting)
+            scores[token] = (shared * math.log(len(in_scope) / df), shared)
+        print(f"\nHäufigste Begleiter (Top {top}):")
+        for token, (_, shared) in sorted(scores.items(), key=lambda kv: -kv[1][0])[:top]:
+            print(f"  {token:<24} {shared:>4}")
+
+def query_constructs(index: dict, scope: str | None) -> None:
+    per_construct = defaultdict(set)
+    for sid, section in index["sections"].items():
+        if scope and scope not in section["file"]:
+            continue
+        for name in section["constructs"]:
+            per_construct[name].add(section["exam"])
+    for name, exams in sorted(per_construct.items(), key=lambda kv: -len(kv[1])):
+        years = sorted({e.split()[0] for e in exams})
+        print(f"  {name:<18} {len(exams):>3} Prüfungen  ({years[0]}–{years[-1]})")
+
+def query_keywords(index: dict, lang: str, scope: str | None) -> None:
+    counts = Counter()
+    per_keyword = defaultdict(set)
+    for section in index["sections"].values():
+        if section["lang"] != lang or (scope and scope not in section["file"]):
+            continue
+        for kw, count in section["keywords"].items():
+            counts[kw] += count
+            per_keyword[kw].add(section["exam"])
+    if not counts:
+        print(f"  Keine {lang}-Dateien im Bereich.")
+    rows = [(kw, count, len(per_keyword[kw])) for kw, count in counts.items()]
+    for kw, count, exams in sorted(rows, key=lambda r: -r[1]):
+        print(f"  {kw:<12} {count:>5}×  in {exams:>3} Prüfungen")
+
+# ─── MAIN ─────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    scoped = argparse.ArgumentParser(add_help=False)
+    scoped.add_argument("--scope", help="only sections from archive files containing this text")
+
+    parser = argparse.ArgumentParser(description="Index and query the exam archive.")
+    parser.add_argument("--rebuild", action="store_true", help="discard the existing index")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("update", help="build or update the index (default)")
+    p_freq = sub.add_parser("freq", parents=[scoped], help="frequency of terms per exam")
+    p_freq.add_argument("terms", nargs="+")
+    p_cooc = sub.add_parser("cooc", parents=[scoped], help="exams containing all terms")
+    p_cooc.add_argument("terms", nargs="+")
+    p_cooc.add_argument("--top", type=int, default=15)
+    sub.add_parser("constructs", parents=[scoped], help="Java/SQL constructs per exam (code files only)")
+    p_kw = sub.add_parser("keywords", parents=[scoped], help="keyword frequencies in that language's files")
+    p_kw.add_argument("lang", choices=["java", "sql"])
+    args = parser.parse_args()
+
+    if not ARCHIVE_DIR.exists():
+        print(f"Archive directory not found: {ARCHIVE_DIR}")
+        sys.exit(1)
+
+    index = empty_index() if args.rebuild else load_index()
+    skipped, resumed, rebuilt, removed = update_index(index)
+    if resumed or rebuilt or removed or args.rebuild:
+        save_index(index)
+    if args.command in (None, "update"):
+        print(f"Index: {len(index['sections'])} sections, {len(index['postings'])} tokens "
+              f"({rebuilt} rebuilt, {resumed} appended, {skipped} unchanged) -> {INDEX_FILE.name}")
+    elif args.command == "freq":
+        query_freq(index, args.terms, args.scope)
+    elif args.command == "cooc":
+        query_cooc(index, args.terms, args.scope, args.top)
+    elif args.command == "constructs":
+        query_constructs(index, args.scope)
+    elif args.command == "keywords":
+        query_keywords(index, args.lang, args.scope)
+
+if __name__ == "__main__":
+    main()
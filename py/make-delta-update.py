@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Delta Update Generator for Abitur Elite Code
+Compares two build outputs (release zips or unpacked folders) and writes
+  - a manifest with the SHA-256 and size of every file in the new build
+  - a delta package with block-level binary patches against the old build
+
+Usage:
+    python make-delta-update.py diff     <old> <new> <delta.zip> [--from X --to Y]
+    python make-delta-update.py manifest <new> <manifest.json> [--version Y]
+    python make-delta-update.py apply    <old> <delta.zip> <out_dir>
+
+`apply` rebuilds the new file tree from the old one and checks every hash,
+so a generated delta can be verified offline before it is uploaded.
+"""
+
+import sys
+import json
+import struct
+import hashlib
+import zipfile
+import argparse
+from pathlib import Path
+
+APP_NAME = "AbiturEliteCode"
+BLOCK_SIZE = 4096
+PATCH_MAGIC = b"AECD1"
+DELTA_FORMAT = 1
+
+# Patch ops: copy <length> bytes from <offset> in the old file, or insert literal data
+OP_COPY = b"C"
+OP_DATA = b"D"
+COPY_STRUCT = struct.Struct("<QI")
+DATA_STRUCT = struct.Struct("<I")
+
+# Fixed entry timestamp so the same two builds always give the same delta bytes
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# ─── FILE TREES ───────────────────────────────────────────────────────────────
+
+def load_tree(path: Path) -> dict[str, bytes]:
+    """Read a build output into {relative posix path: content}.
+    Accepts the release zip or a folder; the AbiturEliteCode/ top folder is stripped."""
+    files = {}
+    if path.is_dir():
+        for f in sorted(path.rglob("*")):
+            if f.is_file():
+                files[f.relative_to(path).as_posix()] = f.read_bytes()
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir():
+                    files[info.filename] = zf.read(info)
+    else:
+        raise FileNotFoundError(f"Not a folder or zip: {path}")
+
+    prefix = APP_NAME + "/"
+    if files and all(name.startswith(prefix) for name in files):
+        files = {name[len(prefix):]: data for name, data in files.items()}
+    return files
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def build_manifest(files: dict[str, bytes], version: str = "") -> dict:
+    return {
+        "app": APP_NAME,
+        "version": version,
+        "files": {name: {"sha256": sha256(data), "size": len(data)}
+                  for name, data in sorted(files.items())},
+    }
+
+# ─── BLOCK DIFF ───────────────────────────────────────────────────────────────
+
+def weak_checksum(block: bytes) -> tuple[int, int]:
+    """rsync-style rolling checksum, returned as its two 16 bit halves."""
+    a = b = 0
+    n = len(block)
+    for i, byte in enumerate(block):
+        a += byte
+        b += (n - i) * byte
+    return a & 0xFFFF, b & 0xFFFF
+
+def diff_bytes(old: bytes, new: bytes, block_size: int = BLOCK_SIZE) -> list[tuple]:
+    """Block-level diff of `new` against `old`.
+    Returns a list of ("copy", offset, length) and ("data", bytes) ops."""
+    exact = {}   # aligned old block -> offset (fast path for unshifted data)
+    weak = {}    # rolling checksum -> [offsets] (resync after inserts/deletes)
+    for offset in range(0, len(old) - block_size + 1, block_size):
+        block = old[offset:offset + block_size]
+        exact.setdefault(block, offset)
+        a, b = weak_checksum(block)
+        weak.setdefault(a | (b << 16), []).append(offset)
+
+    ops = []
+    literal_start = 0
+    pos = 0
+    end = len(new) - block_size
+
+    def emit_copy(offset: int) -> None:
+        if literal_start < pos:
+            ops.append(("data", new[literal_start:pos]))
+        last = ops[-1] if ops else None
+        if last and last[0] == "copy" and last[1] + last[2] == offset:
+            ops[-1] = ("copy", last[1], last[2] + block_size)
+        else:
+            ops.append(("copy", offset, block_size))
+
+    while pos <= end:
+        match = exact.get(new[pos:pos + block_size])
+        if match is not None:
+            emit_copy(match)
+            pos += block_size
+            literal_start = pos
+            continue
+
+        # Roll byte by byte until an old block lines up again
+        a, b = weak_checksum(new[pos:pos + block_size])
+        while True:
+            candidates = weak.get(a | (b << 16))
+            if candidates:
+                window = new[pos:pos + block_size]
+                match = next((o for o in candidates if old[o:o + block_size] == window), None)
+                if match is not None:
+                    break
+            if pos >= end:
+                break
+            out_byte, in_byte = new[pos], new[pos + block_size]
+            a = (a - out_byte + in_byte) & 0xFFFF
+            b = (b - block_size * out_byte + a) & 0xFFFF
+            pos += 1
+
+        if match is None:
+            pos = end + 1
+            break
+        emit_copy(match)
+        pos += block_size
+        literal_start = pos
+
+    if literal_start < len(new):
+        ops.append(("data", new[literal_start:]))
+    return ops
+
+def encode_patch(ops: list[tuple], new_size: int) -> bytes:
+    parts = [PATCH_MAGIC, struct.pack("<Q", new_size)]
+    for op in ops:
+        if op[0] == "copy":
+            parts.append(OP_COPY + COPY_STRUCT.pack(op[1], op[2]))
+        else:
+            parts.append(OP_DATA + DATA_STRUCT.pack(len(op[1])) + op[1])
+    return b"".join(parts)
+
+def apply_patch(old: bytes, patch: bytes) -> bytes:
+    if not patch.startswith(PATCH_MAGIC):
+        raise ValueError("Not a delta patch")
+    pos = len(PATCH_MAGIC)
+    (new_size,) = struct.unpack_from("<Q", patch, pos)
+    pos += 8
+    out = bytearray()
+    while pos < len(patch):
+        op = patch[pos:pos + 1]
+        pos += 1
+        if op == OP_COPY:
+            offset, length = COPY_STRUCT.unpack_from(patch, pos)
+            pos += COPY_STRUCT.size
+            out += old[offset:offset + length]
+        elif op == OP_DATA:
+            (length,) = DATA_STRUCT.unpack_from(patch, pos)
+            pos += DATA_STRUCT.size
+            out += patch[pos:pos + length]
+            pos += length
+        else:
+            raise ValueError(f"Unknown patch op {op!r}")
+    if len(out) != new_size:
+        raise ValueError("Patched file has the wrong size")
+    return bytes(out)
+
+# ─── DELTA PACKAGES ───────────────────────────────────────────────────────────
+
+def write_entry(zf: zipfile.ZipFile, name: str, data: bytes) -> None:
+    entry = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+    entry.compress_type = zf.compression
+    entry.create_system = 3
+    entry.external_attr = 0o100644 << 16
+    zf.writestr(entry, data, compresslevel=zf.compresslevel)
+
+def make_delta(old_path: Path, new_path: Path, delta_path: Path,
+               from_version: str = "", to_version: str = "") -> dict:
+    """Write a delta package turning `old_path` into `new_path`. Returns its manifest."""
+    old_files = load_tree(old_path)
+    new_files = load_tree(new_path)
+    manifest = build_manifest(new_files, to_version)
+    manifest["from_version"] = from_version
+    manifest["format"] = DELTA_FORMAT
+    manifest["base"] = {name: sha256(data) for name, data in sorted(old_files.items())}
+    manifest["removed"] = sorted(old_files.keys() - new_files.keys())
+
+    delta_path.parent.mkdir(parents=True, exist_ok=True)
+    # Deflate, because System.IO.Compression on the client cannot read LZMA entries
+    with zipfile.ZipFile(delta_path, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        for name, data in sorted(new_files.items()):
+            entry = manifest["files"][name]
+            old = old_files.get(name)
+            if old is not None and sha256(old) == entry["sha256"]:
+                entry["action"] = "keep"
+                continue
+            if old is not None:
+                patch = encode_patch(diff_bytes(old, data), len(data))
+                # A patch that is not smaller than the file itself is pointless
+                if len(patch) < len(data):
+                    entry["action"] = "patch"
+                    write_entry(zf, f"patches/{name}", patch)
+                    continue
+            entry["action"] = "add"
+            write_entry(zf, f"files/{name}", data)
+        write_entry(zf, "manifest.json", json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+def apply_delta(old_path: Path, delta_path: Path, out_dir: Path) -> None:
+    """Rebuild the new file tree in `out_dir` and verify it against the manifest."""
+    old_files = load_tree(old_path)
+    with zipfile.ZipFile(delta_path) as zf:
+        manifest = json.loads(zf.read("manifest.json"))
+        for name, base_hash in manifest["base"].items():
+            if name in old_files and sha256(old_files[name]) != base_hash:
+                raise ValueError(f"Base file differs from the delta's base version: {name}")
+
+        for name, entry in manifest["files"].items():
+            if entry["action"] in ("keep", "patch") and name not in old_files:
+                raise ValueError(f"Base file missing: {name}")
+            if entry["action"] == "keep":
+                data = old_files[name]
+            elif entry["action"] == "patch":
+                data = apply_patch(old_files[name], zf.read(f"patches/{name}"))
+            else:
+                data = zf.read(f"files/{name}")
+            if sha256(data) != entry["sha256"]:
+                raise ValueError(f"Hash mismatch after applying delta: {name}")
+            target = out_dir / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+
+# ─── MAIN ─────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate and verify delta update packages.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_diff = sub.add_parser("diff", help="create a delta package from two builds")
+    p_diff.add_argument("old", type=Path)
+    p_diff.add_argument("new", type=Path)
+    p_diff.add_argument("delta", type=Path)
+    p_diff.add_argument("--from", dest="from_version", default="")
+    p_diff.add_argument("--to", dest="to_version", default="")
+    p_manifest = sub.add_parser("manifest", help="write the file hash manifest of a build")
+    p_manifest.add_argument("new", type=Path)
+    p_manifest.add_argument("output", type=Path)
+    p_manifest.add_argument("--version", default="")
+    p_apply = sub.add_parser("apply", help="apply a delta package and verify the result")
+    p_apply.add_argument("old", type=Path)
+    p_apply.add_argument("delta", type=Path)
+    p_apply.add_argument("output", type=Path)
+    args = parser.parse_args()
+
+    try:
+        if args.command == "diff":
+            manifest = make_delta(args.old, args.new, args.delta, args.from_version, args.to_version)
+            actions = [e["action"] for e in manifest["files"].values()]
+            new_size = sum(e["size"] for e in manifest["files"].values())
+            print(f"{args.delta.name}: {args.delta.stat().st_size / 1024:.1f} KB "
+                  f"(full build {new_size / 1_048_576:.1f} MB) — "
+                  f"{actions.count('keep')} kept, {actions.count('patch')} patched, "
+                  f"{actions.count('add')} added, {len(manifest['removed'])} removed")
+        elif args.command == "manifest":
+            manifest = build_manifest(load_tree(args.new), args.version)
+            args.output.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+            print(f"{args.output.name}: {len(manifest['files'])} files")
+        elif args.command == "apply":
+            apply_delta(args.old, args.delta, args.output)
+            print(f"Delta applied and verified -> {args.output}")
+    except (OSError, ValueError, zipfile.BadZipFile) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()